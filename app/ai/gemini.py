@@ -1,5 +1,6 @@
 import os
 import sys
+from functools import lru_cache
 from typing import Optional
 
 from app.sources import ArticleInfo
@@ -130,5 +131,7 @@ class GeminiProvider(AiProvider):
             return ""
 
 
+# Shared, env-configured instance for reading default settings; never call set_config on it.
+@lru_cache(maxsize=1)
 def get_default_gemini_provider() -> Optional[GeminiProvider]:
     return GeminiProvider()
@@ -1,18 +1,37 @@
 """OpenAI provider with real API calls for summaries."""
 import os
 import sys
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional
 
 from openai import OpenAI
 
+from app.core.fast_json import dumps as json_dumps
+from app.core.fast_json import loads as json_loads
 from app.sources import ArticleInfo
 
 from .base import AiProvider
 
 
+# Reply schema shared by the single and batch summary prompts.
+_SUMMARY_SCHEMA = (
+    "{\n"
+    '  "summary_zh": "用中文 2-4 句话概括文章的研究目的、方法和主要结论",\n'
+    '  "usage_zh": "用中文说明在撰写综述或论文时，这篇文章可以如何被引用或使用，'
+    '例如适合放在背景、方法、结果讨论中的哪一部分，以及它支持/补充了哪些观点"\n'
+    "}\n\n"
+)
+
+_SUMMARY_MAX_TOKENS = 320
+# Many OpenAI-compatible models cap a completion at 4096 output tokens; a larger request is
+# rejected outright, so batches are sized to fit every article's reply within it.
+_BATCH_MAX_TOKENS = 4096
+
+
 class OpenAIProvider(AiProvider):
     name = "openai"
     display_name = "OpenAI (实时调用)"
+    max_batch_size = _BATCH_MAX_TOKENS // _SUMMARY_MAX_TOKENS
 
     def __init__(self) -> None:
         self.api_key = os.environ.get("OPENAI_API_KEY")
@@ -77,12 +96,8 @@ class OpenAIProvider(AiProvider):
         system_prompt = (
             "你是一名医学文献综述助手，请根据给定的题目和摘要，输出一个 JSON 对象，"
             "仅包含以下两个字段：\n"
-            "{\n"
-            '  "summary_zh": "用中文 2-4 句话概括文章的研究目的、方法和主要结论",\n'
-            '  "usage_zh": "用中文说明在撰写综述或论文时，这篇文章可以如何被引用或使用，'
-            '例如适合放在背景、方法、结果讨论中的哪一部分，以及它支持/补充了哪些观点"\n'
-            "}\n\n"
-            "只输出合法 JSON，不要输出任何解释性文字或 Markdown。"
+            + _SUMMARY_SCHEMA
+            + "只输出合法 JSON，不要输出任何解释性文字或 Markdown。"
         )
         user_prompt = (
             f"标题: {title}\n期刊: {journal}\n年份: {year}\n摘要: {abstract}\n"
@@ -100,7 +115,7 @@ class OpenAIProvider(AiProvider):
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt},
                 ],
-                max_tokens=320,
+                max_tokens=_SUMMARY_MAX_TOKENS,
             )
             content = completion.choices[0].message.content if completion.choices else ""
             return (content or "").strip()
@@ -110,3 +125,84 @@ class OpenAIProvider(AiProvider):
                 file=sys.stderr,
             )
             return ""
+
+    def summarize_batch(self, infos: List[ArticleInfo]) -> List[str]:
+        """Summarize several articles in one request; "" marks articles the model skipped."""
+        if len(infos) > self.max_batch_size:
+            # More replies than fit in one completion: send consecutive slices instead.
+            step = self.max_batch_size
+            return [
+                summary
+                for start in range(0, len(infos), step)
+                for summary in self.summarize_batch(infos[start : start + step])
+            ]
+        results = ["" for _ in infos]
+        if not infos or not self._ensure_client():
+            return results
+
+        items = []
+        for idx, info in enumerate(infos):
+            abstract = (info.abstract or "").strip()
+            if not abstract:
+                continue
+            items.append(
+                {
+                    "id": str(idx),
+                    "title": (info.title or "").strip(),
+                    "journal": (info.journal or "").strip(),
+                    "year": (info.year or "").strip(),
+                    "abstract": abstract,
+                }
+            )
+        if not items:
+            return results
+
+        system_prompt = (
+            "你是一名医学文献综述助手。用户会提供一个 JSON 数组，每个元素是一篇文献"
+            "（id、title、journal、year、abstract）。请输出一个 JSON 对象，"
+            "键为文献的 id，值为仅包含以下两个字段的对象：\n"
+            + _SUMMARY_SCHEMA
+            + "必须覆盖输入中的每一个 id。只输出合法 JSON，不要输出任何解释性文字或 Markdown。"
+        )
+
+        try:
+            client = self._client
+            if client is None:  # pragma: no cover - defensive
+                return results
+            completion = client.chat.completions.create(
+                model=self.model,
+                temperature=self.temperature,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": json_dumps(items)},
+                ],
+                response_format={"type": "json_object"},
+                max_tokens=_SUMMARY_MAX_TOKENS * len(items),
+            )
+            content = completion.choices[0].message.content if completion.choices else ""
+            parsed = json_loads(content or "")
+        except Exception as exc:  # pragma: no cover - external service errors
+            print(f"警告: 批量生成 OpenAI 总结失败（{len(items)} 篇）: {exc}", file=sys.stderr)
+            return results
+
+        if not isinstance(parsed, dict):
+            return results
+        for key, value in parsed.items():
+            try:
+                idx = int(key)
+            except (TypeError, ValueError):
+                continue
+            if not (0 <= idx < len(results)) or not isinstance(value, dict):
+                continue
+            fields = {
+                k: str(value.get(k) or "").strip() for k in ("summary_zh", "usage_zh") if value.get(k)
+            }
+            if fields:
+                results[idx] = json_dumps(fields)
+        return results
+
+
+# Shared, env-configured instance for reading default settings; never call set_config on it.
+@lru_cache(maxsize=1)
+def get_default_openai_provider() -> Optional[OpenAIProvider]:
+    return OpenAIProvider()
@@ -4,8 +4,8 @@ import json
 import subprocess
 from typing import Dict, List, Tuple
 
-from app.ai.gemini import GeminiProvider
-from app.ai.openai_provider import OpenAIProvider
+from app.ai.gemini import get_default_gemini_provider
+from app.ai.openai_provider import get_default_openai_provider
 
 
 def _normalize_openai_base_url(base_url: str) -> str:
@@ -64,8 +64,9 @@ def list_openai_models(
     api_key: str,
     base_url: str,
 ) -> Tuple[List[str], str]:
-    resolved_key = (api_key or OpenAIProvider().api_key or "").strip()
-    resolved_base = _normalize_openai_base_url((base_url or OpenAIProvider().base_url or "").strip())
+    defaults = get_default_openai_provider()
+    resolved_key = (api_key or defaults.api_key or "").strip()
+    resolved_base = _normalize_openai_base_url((base_url or defaults.base_url or "").strip())
     if not resolved_key:
         return [], "未配置 OpenAI API Key"
 
@@ -85,7 +86,7 @@ def list_gemini_models(
     *,
     api_key: str,
 ) -> Tuple[List[str], str]:
-    resolved_key = (api_key or GeminiProvider().api_key or "").strip()
+    resolved_key = (api_key or get_default_gemini_provider().api_key or "").strip()
     if not resolved_key:
         return [], "未配置 Gemini API Key"
     url = f"https://generativelanguage.googleapis.com/v1beta/models?key={resolved_key}"
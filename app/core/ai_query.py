@@ -1,12 +1,31 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 from typing import List, Optional, Tuple
 
 from openai import OpenAI
 
-from app.ai.gemini import GeminiProvider
-from app.ai.openai_provider import OpenAIProvider
+from app.ai.gemini import GeminiProvider, get_default_gemini_provider
+from app.ai.openai_provider import get_default_openai_provider
+from app.core.llm_cache import fingerprint, get_cache
+
+
+# A usable search query is far shorter than this; a runaway stream is abandoned as a failure
+# rather than returning (and caching) a query cut off mid-term.
+_QUERY_STREAM_MAX_CHARS = 2048
+
+# Segment separators are folded into "," and split with str methods; runs of them yield
+# empty segments, which the loop skips just like the old regex split.
+_SEGMENT_SEPARATORS = "；;，。."
+_SYNONYM_MARKERS = ("或", "or", "OR", "/", "|")
+_SYNONYM_RE = re.compile(r"\s*(?:或|或者|or|OR|/|\|)\s*")
+
+
+# OpenAI clients are thread-safe; reusing one per (key, endpoint) keeps its connection pool warm.
+@lru_cache(maxsize=8)
+def _openai_client(api_key: str, base_url: Optional[str]) -> OpenAI:
+    return OpenAI(api_key=api_key, base_url=base_url)
 
 
 def build_pubmed_query_by_rules(intent: str) -> str:
@@ -14,13 +33,20 @@ def build_pubmed_query_by_rules(intent: str) -> str:
     if not intent_clean:
         return ""
 
-    segments = re.split(r"[；;，。,.]+", intent_clean)
+    for sep in _SEGMENT_SEPARATORS:
+        if sep in intent_clean:
+            intent_clean = intent_clean.replace(sep, ",")
+    segments = intent_clean.split(",")
     groups: List[str] = []
     for segment in segments:
         segment = segment.strip()
         if not segment:
             continue
-        synonyms = re.split(r"\s*(?:或|或者|or|OR|/|\|)\s*", segment)
+        # The regex can only split where one of these markers occurs.
+        if any(marker in segment for marker in _SYNONYM_MARKERS):
+            synonyms = _SYNONYM_RE.split(segment)
+        else:
+            synonyms = [segment]
         synonym_terms: List[str] = []
         for term in synonyms:
             term_clean = term.strip()
@@ -32,16 +58,13 @@ def build_pubmed_query_by_rules(intent: str) -> str:
             else:
                 synonym_terms.append(f"({term_clean}[Title/Abstract])")
         if synonym_terms:
-            if len(synonym_terms) == 1:
-                groups.append(synonym_terms[0])
-            else:
-                groups.append("(" + " OR ".join(synonym_terms) + ")")
+            groups.append(synonym_terms[0] if len(synonym_terms) == 1 else f"({' OR '.join(synonym_terms)})")
     return " AND ".join(groups)
 
 
 def _generate_query_via_openai(prompt: str, api_key: str, base_url: str, model: str, temperature: float) -> str:
     try:
-        client = OpenAI(api_key=api_key, base_url=base_url or None)
+        client = _openai_client(api_key, base_url or None)
         completion = client.chat.completions.create(
             model=model or "gpt-4o-mini",
             temperature=temperature,
@@ -76,11 +99,16 @@ def _generate_query_via_gemini(prompt: str, api_key: str, model: str, temperatur
         contents = [types.Content(role="user", parts=[types.Part.from_text(text=prompt)])]
         config = types.GenerateContentConfig(temperature=temperature)
         chunks: List[str] = []
+        total = 0
         for chunk in client.models.generate_content_stream(model=provider.model, contents=contents, config=config):
             text = getattr(chunk, "text", "") or ""
             if text:
                 chunks.append(text)
-        return " ".join(chunks).strip()
+                total += len(text)
+                if total > _QUERY_STREAM_MAX_CHARS:
+                    return ""
+        # Stream chunks are contiguous fragments; joining with spaces would split CJK terms.
+        return "".join(chunks).strip()
     except Exception:
         return ""
 
@@ -124,40 +152,59 @@ def generate_query_terms(
         "请直接返回最终检索式，保持紧凑易检索，避免过长或堆砌同义词。"
     )
 
-    openai_defaults = OpenAIProvider()
-    resolved_openai_api_key = _normalize(openai_api_key) or (openai_defaults.api_key or "")
-    resolved_openai_base_url = _normalize_optional(openai_base_url) or openai_defaults.base_url or ""
-    resolved_openai_model = _normalize(openai_model) or openai_defaults.model
-    resolved_openai_temperature = openai_temperature if openai_temperature is not None else openai_defaults.temperature
-
-    gemini_defaults = GeminiProvider()
-    resolved_gemini_api_key = _normalize(gemini_api_key) or (gemini_defaults.api_key or "")
-    resolved_gemini_model = _normalize(gemini_model) or gemini_defaults.model
-    resolved_gemini_temperature = gemini_temperature if gemini_temperature is not None else gemini_defaults.temperature
-
     if ai_provider == "openai":
+        openai_defaults = get_default_openai_provider()
+        resolved_openai_api_key = _normalize(openai_api_key) or (openai_defaults.api_key or "")
+        resolved_openai_base_url = _normalize_optional(openai_base_url) or openai_defaults.base_url or ""
+        resolved_openai_model = _normalize(openai_model) or openai_defaults.model
+        resolved_openai_temperature = openai_temperature if openai_temperature is not None else openai_defaults.temperature
         if not resolved_openai_api_key:
             return "", "未配置 OpenAI API Key，无法调用真实接口生成检索式。"
-        ai_query = _generate_query_via_openai(
-            prompt,
+        cache_key = fingerprint(
+            "openai",
             resolved_openai_api_key,
             resolved_openai_base_url,
             resolved_openai_model,
             resolved_openai_temperature,
+            prompt,
         )
+        ai_query = get_cache("query").get(cache_key)
+        if ai_query is None:
+            ai_query = _generate_query_via_openai(
+                prompt,
+                resolved_openai_api_key,
+                resolved_openai_base_url,
+                resolved_openai_model,
+                resolved_openai_temperature,
+            )
+            get_cache("query").put(cache_key, ai_query)
         if ai_query:
             return ai_query, "已使用 OpenAI 实时生成的检索式"
         return "", "OpenAI 生成检索式失败，请检查配置。"
 
     if ai_provider == "gemini":
+        gemini_defaults = get_default_gemini_provider()
+        resolved_gemini_api_key = _normalize(gemini_api_key) or (gemini_defaults.api_key or "")
+        resolved_gemini_model = _normalize(gemini_model) or gemini_defaults.model
+        resolved_gemini_temperature = gemini_temperature if gemini_temperature is not None else gemini_defaults.temperature
         if not resolved_gemini_api_key:
             return "", "未配置 Gemini API Key，无法调用真实接口生成检索式。"
-        ai_query = _generate_query_via_gemini(
-            prompt,
+        cache_key = fingerprint(
+            "gemini",
             resolved_gemini_api_key,
             resolved_gemini_model,
             resolved_gemini_temperature,
+            prompt,
         )
+        ai_query = get_cache("query").get(cache_key)
+        if ai_query is None:
+            ai_query = _generate_query_via_gemini(
+                prompt,
+                resolved_gemini_api_key,
+                resolved_gemini_model,
+                resolved_gemini_temperature,
+            )
+            get_cache("query").put(cache_key, ai_query)
         if ai_query:
             return ai_query, "已使用 Gemini 实时生成的检索式"
         return "", "Gemini 生成检索式失败，请检查配置。"
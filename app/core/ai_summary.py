@@ -3,58 +3,135 @@ from __future__ import annotations
 """Reusable AI summary helpers."""
 
 import os
-import json
 import re
 import random
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
 from app.ai.gemini import GeminiProvider
 from app.ai.openai_provider import OpenAIProvider
 from app.ai.registry import get_provider
+from app.core.fast_json import dumps as json_dumps
+from app.core.fast_json import loads as json_loads
+from app.core.llm_cache import fingerprint, get_cache
 from app.sources import ArticleInfo
 
 
+_JSON_BLOB_RE = re.compile(r"\{.*\}", re.DOTALL)
+_ANNOTE_CACHE_MAX_CHARS = 16 * 1024
+
+# Per-provider caps on AI summary workers, to stay under each provider's rate limits.
+_PROVIDER_PARALLEL_ENV = {"openai": "OPENAI_MAX_PARALLEL", "gemini": "GEMINI_MAX_PARALLEL"}
+
+
+def _provider_parallel_cap(provider_name: str) -> int:
+    env_key = _PROVIDER_PARALLEL_ENV.get(provider_name)
+    if not env_key:
+        return 0
+    try:
+        return int(os.environ.get(env_key, "").strip() or "0")
+    except ValueError:
+        return 0
+
+
+def _summary_batch_size() -> int:
+    # Articles packed into one request for providers with summarize_batch; <= 1 disables batching.
+    try:
+        configured = int(os.environ.get("AI_SUMMARY_BATCH_SIZE", "").strip() or "0")
+    except ValueError:
+        configured = 0
+    return configured
+
+
 def normalize_annote(raw: str) -> Tuple[str, str, str]:
     """Normalize annote content and try to extract summary/usage fields."""
 
+    raw = raw or ""
+    # Oversized replies are parsed directly so they never pin memory in the cache.
+    if len(raw) > _ANNOTE_CACHE_MAX_CHARS:
+        return _normalize_annote_impl(raw)
+    return _normalize_annote_cached(raw)
+
+
+# Pure function of its input and the result tuple is immutable. Each article is normalized once,
+# so this pays off for duplicate replies and for replies served again from the summary cache.
+@lru_cache(maxsize=4096)
+def _normalize_annote_cached(raw: str) -> Tuple[str, str, str]:
+    return _normalize_annote_impl(raw)
+
+
+def _strip_fence(text: str) -> str:
+    # Equivalent to removing ^```(?:json)?\s* and \s*```$ from already-stripped text.
+    if text.startswith("```"):
+        text = text[7:] if text[3:7].lower() == "json" else text[3:]
+    if text.endswith("```"):
+        text = text[:-3]
+    return text.strip()
+
+
+def _parse_json_object(candidate: str) -> Optional[Dict[str, object]]:
+    try:
+        parsed = json_loads(candidate)
+    except Exception:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def _annote_from_object(parsed: Dict[str, object], candidate: str) -> Tuple[str, str, str]:
+    summary = str(parsed.get("summary_zh") or "").strip()
+    usage = str(parsed.get("usage_zh") or "").strip()
+    fields = {k: v for k, v in (("summary_zh", summary), ("usage_zh", usage)) if v}
+    # Already-normalized input (e.g. our own earlier output) is returned as is. Without a
+    # backslash the values hold no escapes or quotes, so this rebuild is exactly what
+    # json_dumps would produce.
+    if "\\" not in candidate and parsed == fields:
+        canonical = "{" + ",".join(f'"{k}":"{v}"' for k, v in fields.items()) + "}"
+        if candidate == canonical:
+            return candidate, summary, usage
+    return json_dumps(fields), summary, usage
+
+
+def _normalize_annote_impl(raw: str) -> Tuple[str, str, str]:
     text = (raw or "").strip()
     if not text:
         return "", "", ""
 
-    candidates: List[str] = []
-
-    def _add_candidate(val: str) -> None:
-        if val and val not in candidates:
-            candidates.append(val)
+    # Without a brace no candidate can parse to a dict; plain-text replies skip all parsing.
+    if "{" not in text:
+        fence_trimmed = _strip_fence(text)
+        return fence_trimmed, fence_trimmed, ""
 
-    _add_candidate(text)
+    # Fast path: providers usually return clean JSON, so skip the regex work entirely.
+    parsed = _parse_json_object(text)
+    if parsed is not None:
+        return _annote_from_object(parsed, text)
 
-    fence_trimmed = re.sub(r"^```(?:json)?\s*|\s*```$", "", text, flags=re.IGNORECASE).strip()
-    _add_candidate(fence_trimmed)
+    # At most two fallbacks (fence-trimmed text, then the outermost brace span); each is
+    # only parsed when it differs from what was already tried.
+    fence_trimmed = _strip_fence(text)
+    if fence_trimmed and fence_trimmed != text:
+        parsed = _parse_json_object(fence_trimmed)
+        if parsed is not None:
+            return _annote_from_object(parsed, fence_trimmed)
 
-    match = re.search(r"\{.*\}", fence_trimmed, flags=re.DOTALL)
+    match = _JSON_BLOB_RE.search(fence_trimmed)
     if match:
-        _add_candidate(match.group(0).strip())
-
-    for candidate in candidates:
-        try:
-            parsed = json.loads(candidate)
-        except Exception:
-            continue
-        if isinstance(parsed, dict):
-            summary = str(parsed.get("summary_zh") or "").strip()
-            usage = str(parsed.get("usage_zh") or "").strip()
-            normalized_json = json.dumps(
-                {k: v for k, v in (("summary_zh", summary), ("usage_zh", usage)) if v},
-                ensure_ascii=False,
-            )
-            return normalized_json, summary, usage
+        blob = match.group(0).strip()
+        if blob != text and blob != fence_trimmed:
+            parsed = _parse_json_object(blob)
+            if parsed is not None:
+                return _annote_from_object(parsed, blob)
 
     return fence_trimmed, fence_trimmed, ""
 
 
+def _store_annote(info: ArticleInfo, raw: str) -> None:
+    info.annote, info.summary_zh, info.usage_zh = normalize_annote(raw)
+
+
 def apply_ai_summary(
     infos: List[ArticleInfo],
     provider_name: str,
@@ -104,8 +181,23 @@ def apply_ai_summary(
         max_workers = len(infos)
     else:
         max_workers = configured
+    provider_cap = _provider_parallel_cap(provider_name)
+    if provider_cap > 0:
+        max_workers = min(max_workers, provider_cap)
     max_workers = max(1, min(max_workers, len(infos)))
 
+    # One configured provider per worker thread, so its client (and connection pool)
+    # is reused across the articles that worker handles.
+    worker_state = threading.local()
+
+    def _worker_provider():
+        if not hasattr(worker_state, "provider"):
+            provider = get_provider(provider_name)
+            if provider:
+                _configure(provider)
+            worker_state.provider = provider
+        return worker_state.provider
+
     def _summarize_one(idx: int) -> Tuple[int, str]:
         info = infos[idx]
         if not (info.abstract or "").strip():
@@ -113,11 +205,10 @@ def apply_ai_summary(
 
         max_retry = 2
         for attempt in range(max_retry + 1):
-            provider = get_provider(provider_name)
+            provider = _worker_provider()
             if not provider:
                 return idx, ""
             try:
-                _configure(provider)
                 summary = (provider.summarize(info) or "").strip()
                 if summary:
                     return idx, summary
@@ -130,20 +221,68 @@ def apply_ai_summary(
 
         return idx, ""
 
-    if max_workers <= 1 or len(infos) <= 1:
-        for idx in range(len(infos)):
-            _, summary = _summarize_one(idx)
-            if summary:
-                infos[idx].annote, _, _ = normalize_annote(summary)
-                applied += 1
-    else:
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = [executor.submit(_summarize_one, idx) for idx in range(len(infos))]
+    def _run_all(fn, items):
+        if max_workers <= 1 or len(items) <= 1:
+            for item in items:
+                yield fn(item)
+            return
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            futures = [executor.submit(fn, item) for item in items]
             for fut in as_completed(futures):
-                idx, summary = fut.result()
+                yield fut.result()
+
+    # Identical article + provider config -> reuse an earlier reply instead of paying for a new call.
+    cache = get_cache("summary")
+    if provider_name == "gemini":
+        config_parts = (gemini_api_key, gemini_model, gemini_temperature)
+    else:
+        config_parts = (openai_api_key, openai_base_url, openai_model, openai_temperature)
+    cache_keys = [
+        fingerprint(provider_name, *config_parts, info.title, info.journal, info.year, info.abstract)
+        for info in infos
+    ]
+
+    pending: List[int] = []
+    for idx, info in enumerate(infos):
+        cached = cache.get(cache_keys[idx])
+        if cached:
+            _store_annote(info, cached)
+            applied += 1
+        else:
+            pending.append(idx)
+
+    # Clamped to what the provider fits in one completion, so a large setting can't truncate replies.
+    batch_size = min(_summary_batch_size(), int(getattr(base_provider, "max_batch_size", 1)))
+    if batch_size > 1 and callable(getattr(base_provider, "summarize_batch", None)):
+        with_abstract = [idx for idx in pending if (infos[idx].abstract or "").strip()]
+        batches = [with_abstract[i : i + batch_size] for i in range(0, len(with_abstract), batch_size)]
+
+        def _summarize_batch(indices: List[int]) -> Tuple[List[int], List[str]]:
+            provider = _worker_provider()
+            if not provider:
+                return indices, []
+            try:
+                return indices, list(provider.summarize_batch([infos[idx] for idx in indices]))
+            except Exception:  # pylint: disable=broad-except
+                return indices, []
+
+        done = set()
+        for indices, summaries in _run_all(_summarize_batch, batches):
+            for idx, summary in zip(indices, summaries):
+                summary = (summary or "").strip()
                 if summary:
-                    infos[idx].annote, _, _ = normalize_annote(summary)
+                    _store_annote(infos[idx], summary)
+                    cache.put(cache_keys[idx], summary)
                     applied += 1
+                    done.add(idx)
+        # Articles the batch reply skipped or mangled fall back to one call each.
+        pending = [idx for idx in pending if idx not in done]
+
+    for idx, summary in _run_all(_summarize_one, pending):
+        if summary:
+            _store_annote(infos[idx], summary)
+            cache.put(cache_keys[idx], summary)
+            applied += 1
     if applied:
         return f"已使用 {provider_display_name} 生成 {applied} 条摘要"
     return "AI 未返回摘要，可能未配置模型或接口未返回内容"
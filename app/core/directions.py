@@ -4,8 +4,8 @@ from __future__ import annotations
 import re
 from typing import List, Tuple
 
-from app.ai.gemini import GeminiProvider
-from app.ai.openai_provider import OpenAIProvider
+from app.ai.gemini import GeminiProvider, get_default_gemini_provider
+from app.ai.openai_provider import get_default_openai_provider
 from openai import OpenAI
 
 
@@ -65,10 +65,15 @@ def _extract_directions_via_gemini(
 
 
 def _parse_direction_lines(raw: str) -> List[str]:
+    # Models often repeat a direction with different case or spacing; each copy would run a
+    # full query generation + search + summary pipeline, so keep only the first one.
     lines: List[str] = []
+    seen = set()
     for line in (raw or "").splitlines():
         cleaned = re.sub(r"^[\s\d\.-:：•、]+", "", line).strip()
-        if cleaned:
+        key = " ".join(cleaned.lower().split())
+        if key and key not in seen:
+            seen.add(key)
             lines.append(cleaned)
     return lines
 
@@ -93,13 +98,13 @@ def extract_search_directions(
 
     prompt = "请阅读以下文本，提炼适合学术文献检索的方向（每行一个、无需编号）：\n" + content_clean
 
-    openai_defaults = OpenAIProvider()
+    openai_defaults = get_default_openai_provider()
     resolved_openai_api_key = (openai_api_key or openai_defaults.api_key or "").strip()
     resolved_openai_base_url = (openai_base_url or openai_defaults.base_url or "").strip()
     resolved_openai_model = (openai_model or openai_defaults.model or "").strip()
     resolved_openai_temperature = openai_temperature if openai_temperature is not None else openai_defaults.temperature
 
-    gemini_defaults = GeminiProvider()
+    gemini_defaults = get_default_gemini_provider()
     resolved_gemini_api_key = (gemini_api_key or gemini_defaults.api_key or "").strip()
     resolved_gemini_model = (gemini_model or gemini_defaults.model or "").strip()
     resolved_gemini_temperature = gemini_temperature if gemini_temperature is not None else gemini_defaults.temperature
@@ -0,0 +1,22 @@
+"""JSON helpers that use orjson when it is installed and fall back to the stdlib."""
+from __future__ import annotations
+
+import json
+
+try:  # Optional speedup: orjson is a native encoder/decoder, notably faster on long CJK strings.
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - orjson not installed
+    _orjson = None
+
+
+def loads(text: str) -> object:
+    if _orjson is not None:
+        return _orjson.loads(text)
+    return json.loads(text)
+
+
+def dumps(payload: object) -> str:
+    # Keep the compact orjson layout in the fallback so output is identical either way.
+    if _orjson is not None:
+        return _orjson.dumps(payload).decode("utf-8")
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
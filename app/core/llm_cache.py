@@ -0,0 +1,57 @@
+"""Process-local exact-match cache for LLM results (generated queries, article summaries)."""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+
+
+class LlmCache:
+    """Thread-safe LRU of fingerprint -> reply text; maxsize <= 0 disables it."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        if self.maxsize <= 0:
+            return None
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        # Only real replies are stored, so failures are retried on the next call.
+        if self.maxsize <= 0 or not value:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+
+def fingerprint(*parts: object) -> str:
+    """Stable key for a call: every input that can change the reply must be among the parts."""
+
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+# Built on first use: LLM_CACHE_SIZE comes from .env, which create_app loads after import.
+@lru_cache(maxsize=None)
+def get_cache(name: str) -> LlmCache:
+    try:
+        maxsize = int(os.environ.get("LLM_CACHE_SIZE", "").strip() or "4096")
+    except ValueError:
+        maxsize = 4096
+    return LlmCache(maxsize)
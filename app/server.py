@@ -8,8 +8,9 @@ import sqlite3
 import threading
 import uuid
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from functools import wraps
+from functools import lru_cache, wraps
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, List, Mapping
 
 from flask import (
@@ -49,10 +50,12 @@ from app.core.db import (
 )
 from app.core.db import connect as db_connect
 from app.core.directions import extract_search_directions
+from app.core.fast_json import dumps as json_dumps
 from app.core.env_loader import get_env_flag, load_env
 from app.sources.registry import list_sources
 from app.web.forms import (
     default_ai_provider_name,
+    default_form,
     default_source_name,
     get_source_defaults,
     parse_float,
@@ -61,6 +64,7 @@ from app.web.forms import (
 )
 from app.web.search import (
     consume_search_stream,
+    drain_status_batch,
     perform_search_stream,
     prefix_status,
     sse_message,
@@ -69,6 +73,38 @@ from app.web.search import (
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
+# X-Accel-Buffering stops nginx-style reverse proxies from holding SSE frames until the stream ends.
+_SSE_HEADERS = {"Cache-Control": "no-cache", "Connection": "keep-alive", "X-Accel-Buffering": "no"}
+
+
+@lru_cache(maxsize=1)
+def _cached_sources():
+    # The registries are fixed after import; avoid rebuilding (and re-instantiating providers) per request.
+    return tuple(list_sources())
+
+
+@lru_cache(maxsize=1)
+def _cached_providers():
+    return tuple(list_providers())
+
+
+@lru_cache(maxsize=1)
+def _cached_source_defaults() -> Dict[str, Dict[str, str | int]]:
+    # Plain dict copies: the page template serializes these with tojson.
+    return {source.name: dict(get_source_defaults(source.name)) for source in _cached_sources()}
+
+
+@lru_cache(maxsize=1)
+def _static_render_context() -> Mapping[str, object]:
+    # Page context shared by every index/workflow render; callers only add per-request keys.
+    return MappingProxyType(
+        {
+            "sources": _cached_sources(),
+            "ai_providers": _cached_providers(),
+            "source_defaults": _cached_source_defaults(),
+        }
+    )
+
 
 def _initial_credits() -> int:
     try:
@@ -140,6 +176,21 @@ def create_app() -> Flask:
     admin_email = (os.environ.get("ADMIN_EMAIL") or "").strip().lower()
     admin_password = os.environ.get("ADMIN_PASSWORD") or ""
 
+    def _json_response(payload: Dict[str, object], status: int = 200) -> Response:
+        return Response(json_dumps(payload), status=status, mimetype="application/json")
+
+    # Keyword arguments shared by extract_search_directions and generate_query_terms.
+    def _ai_call_kwargs(ai_payload: Mapping[str, object]) -> Dict[str, object]:
+        return {
+            "gemini_api_key": str(ai_payload.get("gemini_api_key") or ""),
+            "gemini_model": str(ai_payload.get("gemini_model") or ""),
+            "gemini_temperature": float(ai_payload.get("gemini_temperature") or 0.0),
+            "openai_api_key": str(ai_payload.get("openai_api_key") or ""),
+            "openai_base_url": str(ai_payload.get("openai_base_url") or ""),
+            "openai_model": str(ai_payload.get("openai_model") or ""),
+            "openai_temperature": float(ai_payload.get("openai_temperature") or 0.0),
+        }
+
     def _allow_ai_config() -> bool:
         return bool(getattr(g, "current_user", None) and getattr(g.current_user, "is_admin", False))
 
@@ -286,18 +337,15 @@ def create_app() -> Flask:
         articles: List[Dict[str, str]] = []
         status_log: List[Dict[str, str]] = []
 
-        sources = list_sources()
-        ai_providers = list_providers()
         allow_ai_customization = _allow_ai_config()
         ai_presets = _ai_presets()
 
-        form, resolved = resolve_form(
-            request.form if request.method == "POST" else {},
-            allow_ai_customization=allow_ai_customization,
-            preset_ai_config=ai_presets,
-        )
-
         if request.method == "POST":
+            form, resolved = resolve_form(
+                request.form,
+                allow_ai_customization=allow_ai_customization,
+                preset_ai_config=ai_presets,
+            )
             if not resolved["query"]:
                 error = "请输入检索式。"
             else:
@@ -306,40 +354,31 @@ def create_app() -> Flask:
                 except Exception as exc:  # pylint: disable=broad-except
                     error = f"检索或生成 BibTeX 时出错：{exc}"
                     status_log.append(status_log_entry("流程中断", "error", str(exc)))
-
-        source_defaults = {source.name: get_source_defaults(source.name) for source in sources}
+        else:
+            form = default_form(preset_ai_config=ai_presets)
 
         return render_template(
             "index.html",
+            **_static_render_context(),
             current_page="index",
             form=form,
             error=error,
             bibtex_text=bibtex_text,
             count=count,
             articles=articles,
-            sources=sources,
-            ai_providers=ai_providers,
-            source_defaults=source_defaults,
             status_log=status_log,
         )
 
     @app.route("/workflow", methods=["GET"])
     @login_required
     def workflow():
-        sources = list_sources()
-        ai_providers = list_providers()
-        allow_ai_customization = _allow_ai_config()
-        ai_presets = _ai_presets()
-        form, _ = resolve_form({}, allow_ai_customization=allow_ai_customization, preset_ai_config=ai_presets)
-        source_defaults = {source.name: get_source_defaults(source.name) for source in sources}
+        form = default_form(preset_ai_config=_ai_presets())
 
         return render_template(
             "workflow.html",
+            **_static_render_context(),
             current_page="workflow",
             form=form,
-            sources=sources,
-            ai_providers=ai_providers,
-            source_defaults=source_defaults,
             status_log=[],
             bibtex_text="",
             count=0,
@@ -597,7 +636,14 @@ def create_app() -> Flask:
         if not output_name:
             output_name = str(get_source_defaults(source)["output"])
         filename = output_name
-        resp = Response(bibtex_text, mimetype="application/x-bibtex; charset=utf-8")
+        # Encode once so Content-Length is known, then stream fixed 8 KB chunks
+        # (one write per line meant thousands of tiny writes for large exports).
+        body = bibtex_text.encode("utf-8")
+        resp = Response(
+            (body[i : i + 8192] for i in range(0, len(body), 8192)),
+            mimetype="application/x-bibtex; charset=utf-8",
+        )
+        resp.headers["Content-Length"] = str(len(body))
         resp.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
         return resp
 
@@ -613,15 +659,9 @@ def create_app() -> Flask:
             source_name=source,
             intent=intent,
             ai_provider=ai_provider,
-            gemini_api_key=str(ai_payload.get("gemini_api_key") or ""),
-            gemini_model=str(ai_payload.get("gemini_model") or ""),
-            gemini_temperature=float(ai_payload.get("gemini_temperature") or 0.0),
-            openai_api_key=str(ai_payload.get("openai_api_key") or ""),
-            openai_base_url=str(ai_payload.get("openai_base_url") or ""),
-            openai_model=str(ai_payload.get("openai_model") or ""),
-            openai_temperature=float(ai_payload.get("openai_temperature") or 0.0),
+            **_ai_call_kwargs(ai_payload),
         )
-        return jsonify({"query": query, "message": message})
+        return _json_response({"query": query, "message": message})
 
     @app.route("/api/list_models", methods=["POST"])
     @admin_required
@@ -660,11 +700,13 @@ def create_app() -> Flask:
         summary_ai_provider = (data.get("summary_ai_provider") or data.get("ai_provider") or default_provider).strip()
         if not allow_ai_customization:
             direction_ai_provider = query_ai_provider = summary_ai_provider = default_provider
+        # Resolved once per request; every direction and query retry reuses these.
+        ai_kwargs = _ai_call_kwargs(ai_payload)
         years = parse_int(data.get("years"), int(get_source_defaults(source)["years"]))
         desired_count = parse_int(data.get("direction_count"), 0)
         if desired_count <= 0:
             desired_count = None
-            max_results = max(
+        max_results = max(
             1,
             parse_int(data.get("max_results_per_direction") or data.get("max_results"), 3),
         )
@@ -684,13 +726,7 @@ def create_app() -> Flask:
         directions, extraction_message = extract_search_directions(
             content=data.get("content") or "",
             ai_provider=direction_ai_provider,
-            gemini_api_key=str(ai_payload.get("gemini_api_key") or ""),
-            gemini_model=str(ai_payload.get("gemini_model") or ""),
-            gemini_temperature=float(ai_payload.get("gemini_temperature") or 0.0),
-            openai_api_key=str(ai_payload.get("openai_api_key") or ""),
-            openai_base_url=str(ai_payload.get("openai_base_url") or ""),
-            openai_model=str(ai_payload.get("openai_model") or ""),
-            openai_temperature=float(ai_payload.get("openai_temperature") or 0.0),
+            **ai_kwargs,
             desired_count=desired_count,
         )
         if not getattr(g, "is_admin", False):
@@ -699,7 +735,7 @@ def create_app() -> Flask:
         status_log: List[Dict[str, str]] = []
         if not directions:
             status_log.append(status_log_entry("提取方向", "error", extraction_message))
-            return jsonify({"error": extraction_message, "status_log": status_log}), 400
+            return _json_response({"error": extraction_message, "status_log": status_log}, 400)
         status_log.append(status_log_entry("提取方向", "success", extraction_message))
 
         run_id = str(uuid.uuid4())
@@ -733,7 +769,7 @@ def create_app() -> Flask:
         except Exception as exc:  # pylint: disable=broad-except
             finish_workflow_run(_get_db(), run_id=run_id, status="failed", error_message=str(exc))
             status_log.append(status_log_entry("扣费", "error", str(exc)))
-            return jsonify({"error": str(exc), "status_log": status_log, "run_id": run_id}), 402
+            return _json_response({"error": str(exc), "status_log": status_log, "run_id": run_id}, 402)
 
         direction_details: List[Dict[str, object]] = []
 
@@ -757,13 +793,7 @@ def create_app() -> Flask:
                     source_name=source,
                     intent=direction,
                     ai_provider=query_ai_provider,
-                    gemini_api_key=str(ai_payload.get("gemini_api_key") or ""),
-                    gemini_model=str(ai_payload.get("gemini_model") or ""),
-                    gemini_temperature=float(ai_payload.get("gemini_temperature") or 0.0),
-                    openai_api_key=str(ai_payload.get("openai_api_key") or ""),
-                    openai_base_url=str(ai_payload.get("openai_base_url") or ""),
-                    openai_model=str(ai_payload.get("openai_model") or ""),
-                    openai_temperature=float(ai_payload.get("openai_temperature") or 0.0),
+                    **ai_kwargs,
                 )
 
                 if not query:
@@ -795,8 +825,10 @@ def create_app() -> Flask:
                 count = 0
                 articles: List[Dict[str, str]] = []
 
-                while True:
-                    resolved_payload = {
+                # Only the query changes between retries; resolve everything else once so the
+                # generated placeholder email also stays the same across attempts.
+                _, base_resolved = resolve_form(
+                    {
                         "source": source,
                         "query": current_query,
                         "years": str(years),
@@ -807,20 +839,21 @@ def create_app() -> Flask:
                         "output": (data.get("output") or "").strip(),
                         "gemini_api_key": str(ai_payload.get("gemini_api_key") or ""),
                         "gemini_model": str(ai_payload.get("gemini_model") or ""),
-                        "gemini_temperature": ai_payload.get("gemini_temperature") or "0",
+                        "gemini_temperature": str(ai_payload.get("gemini_temperature") or "0"),
                         "openai_api_key": str(ai_payload.get("openai_api_key") or ""),
                         "openai_base_url": str(ai_payload.get("openai_base_url") or ""),
                         "openai_model": str(ai_payload.get("openai_model") or ""),
-                        "openai_temperature": ai_payload.get("openai_temperature") or "0",
-                    }
-                    _, resolved = resolve_form(
-                        resolved_payload,
-                        allow_ai_customization=allow_ai_customization,
-                        preset_ai_config=preset_ai_config,
-                    )
-                    if not summary_ai_provider:
-                        resolved["ai_provider"] = ""
-                    resolved["pubmed_semaphore"] = pubmed_semaphore
+                        "openai_temperature": str(ai_payload.get("openai_temperature") or "0"),
+                    },
+                    allow_ai_customization=allow_ai_customization,
+                    preset_ai_config=preset_ai_config,
+                )
+                if not summary_ai_provider:
+                    base_resolved["ai_provider"] = ""
+                base_resolved["pubmed_semaphore"] = pubmed_semaphore
+
+                while True:
+                    resolved = {**base_resolved, "query": current_query.strip()}
                     search_error, bibtex_text, count, articles, search_status_log = consume_search_stream(resolved)
                     direction_status_log.extend(search_status_log)
 
@@ -843,13 +876,7 @@ def create_app() -> Flask:
                         source_name=source,
                         intent=retry_prompt,
                         ai_provider=query_ai_provider,
-                        gemini_api_key=str(ai_payload.get("gemini_api_key") or ""),
-                        gemini_model=str(ai_payload.get("gemini_model") or ""),
-                        gemini_temperature=float(ai_payload.get("gemini_temperature") or 0.0),
-                        openai_api_key=str(ai_payload.get("openai_api_key") or ""),
-                        openai_base_url=str(ai_payload.get("openai_base_url") or ""),
-                        openai_model=str(ai_payload.get("openai_model") or ""),
-                        openai_temperature=float(ai_payload.get("openai_temperature") or 0.0),
+                        **ai_kwargs,
                     )
 
                     if not current_query:
@@ -946,9 +973,9 @@ def create_app() -> Flask:
                 if isinstance(articles, list):
                     combined_articles.extend(articles)
 
-            combined_bibtex = "\n\n".join(part.strip() for part in combined_bibtex_parts if part.strip())
+            combined_bibtex = "\n\n".join(combined_bibtex_parts)  # parts are stripped and non-empty on append
             finish_workflow_run(_get_db(), run_id=run_id, status="succeeded")
-            return jsonify(
+            return _json_response(
                 {
                     "run_id": run_id,
                     "directions": direction_details,
@@ -962,7 +989,7 @@ def create_app() -> Flask:
         except Exception as exc:  # pylint: disable=broad-except
             finish_workflow_run(_get_db(), run_id=run_id, status="failed", error_message=str(exc))
             status_log.append(status_log_entry("自动工作流", "error", str(exc)))
-            return jsonify({"error": str(exc), "status_log": status_log, "run_id": run_id}), 500
+            return _json_response({"error": str(exc), "status_log": status_log, "run_id": run_id}, 500)
 
     @app.route("/api/auto_workflow_stream", methods=["POST"])
     @login_required
@@ -978,6 +1005,8 @@ def create_app() -> Flask:
         summary_ai_provider = (data.get("summary_ai_provider") or data.get("ai_provider") or default_provider).strip()
         if not allow_ai_customization:
             direction_ai_provider = query_ai_provider = summary_ai_provider = default_provider
+        # Resolved once per request; every direction and query retry reuses these.
+        ai_kwargs = _ai_call_kwargs(ai_payload)
         years = parse_int(data.get("years"), int(get_source_defaults(source)["years"]))
         desired_count = parse_int(data.get("direction_count"), 0)
         if desired_count <= 0:
@@ -1011,13 +1040,7 @@ def create_app() -> Flask:
                 directions, extraction_message = extract_search_directions(
                     content=data.get("content") or "",
                     ai_provider=direction_ai_provider,
-                    gemini_api_key=str(ai_payload.get("gemini_api_key") or ""),
-                    gemini_model=str(ai_payload.get("gemini_model") or ""),
-                    gemini_temperature=float(ai_payload.get("gemini_temperature") or 0.0),
-                    openai_api_key=str(ai_payload.get("openai_api_key") or ""),
-                    openai_base_url=str(ai_payload.get("openai_base_url") or ""),
-                    openai_model=str(ai_payload.get("openai_model") or ""),
-                    openai_temperature=float(ai_payload.get("openai_temperature") or 0.0),
+                    **ai_kwargs,
                     desired_count=desired_count,
                 )
                 if not getattr(g, "is_admin", False):
@@ -1093,13 +1116,7 @@ def create_app() -> Flask:
                             source_name=source,
                             intent=direction,
                             ai_provider=query_ai_provider,
-                            gemini_api_key=str(ai_payload.get("gemini_api_key") or ""),
-                            gemini_model=str(ai_payload.get("gemini_model") or ""),
-                            gemini_temperature=float(ai_payload.get("gemini_temperature") or 0.0),
-                            openai_api_key=str(ai_payload.get("openai_api_key") or ""),
-                            openai_base_url=str(ai_payload.get("openai_base_url") or ""),
-                            openai_model=str(ai_payload.get("openai_model") or ""),
-                            openai_temperature=float(ai_payload.get("openai_temperature") or 0.0),
+                            **ai_kwargs,
                         )
 
                         if not query:
@@ -1132,8 +1149,10 @@ def create_app() -> Flask:
                         view_articles: List[Dict[str, str]] = []
                         search_error = ""
 
-                        while True:
-                            resolved_payload = {
+                        # Only the query changes between retries; resolve everything else once so the
+                        # generated placeholder email also stays the same across attempts.
+                        _, base_resolved = resolve_form(
+                            {
                                 "source": source,
                                 "query": current_query,
                                 "years": str(years),
@@ -1144,30 +1163,33 @@ def create_app() -> Flask:
                                 "output": (data.get("output") or "").strip(),
                                 "gemini_api_key": str(ai_payload.get("gemini_api_key") or ""),
                                 "gemini_model": str(ai_payload.get("gemini_model") or ""),
-                                "gemini_temperature": ai_payload.get("gemini_temperature") or "0",
+                                "gemini_temperature": str(ai_payload.get("gemini_temperature") or "0"),
                                 "openai_api_key": str(ai_payload.get("openai_api_key") or ""),
                                 "openai_base_url": str(ai_payload.get("openai_base_url") or ""),
                                 "openai_model": str(ai_payload.get("openai_model") or ""),
-                                "openai_temperature": ai_payload.get("openai_temperature") or "0",
-                            }
-                            _, resolved = resolve_form(
-                                resolved_payload,
-                                allow_ai_customization=allow_ai_customization,
-                                preset_ai_config=preset_ai_config,
-                            )
-                            if not summary_ai_provider:
-                                resolved["ai_provider"] = ""
-                            resolved["pubmed_semaphore"] = pubmed_semaphore
+                                "openai_temperature": str(ai_payload.get("openai_temperature") or "0"),
+                            },
+                            allow_ai_customization=allow_ai_customization,
+                            preset_ai_config=preset_ai_config,
+                        )
+                        if not summary_ai_provider:
+                            base_resolved["ai_provider"] = ""
+                        base_resolved["pubmed_semaphore"] = pubmed_semaphore
+
+                        while True:
+                            resolved = {**base_resolved, "query": current_query.strip()}
 
                             for event in perform_search_stream(**resolved):
                                 if event.get("type") == "status" and event.get("entry"):
                                     _emit("status", {"entry": _prefixed(direction, event["entry"])})
-                                if event.get("type") == "result":
+                                if event.get("type") == "article":
+                                    view_articles.append(event["article"])
+                                if event.get("type") == "result_end":
                                     bibtex_text = str(event.get("bibtex_text") or "")
                                     count = int(event.get("count") or 0)
-                                    view_articles = event.get("articles") or []
                                 if event.get("type") == "error" and event.get("message"):
                                     search_error = str(event.get("message"))
+                                    view_articles = []
 
                             if not search_error or count > 0:
                                 break
@@ -1194,13 +1216,7 @@ def create_app() -> Flask:
                                 source_name=source,
                                 intent=retry_prompt,
                                 ai_provider=query_ai_provider,
-                                gemini_api_key=str(ai_payload.get("gemini_api_key") or ""),
-                                gemini_model=str(ai_payload.get("gemini_model") or ""),
-                                gemini_temperature=float(ai_payload.get("gemini_temperature") or 0.0),
-                                openai_api_key=str(ai_payload.get("openai_api_key") or ""),
-                                openai_base_url=str(ai_payload.get("openai_base_url") or ""),
-                                openai_model=str(ai_payload.get("openai_model") or ""),
-                                openai_temperature=float(ai_payload.get("openai_temperature") or 0.0),
+                                **ai_kwargs,
                             )
                             if not current_query:
                                 _emit(
@@ -1291,10 +1307,22 @@ def create_app() -> Flask:
                     combined_articles: List[Dict[str, str]] = []
                     total_count = 0
                     finished = 0
+                    pending: tuple[str, Dict[str, object]] | None = None
 
                     while finished < len(directions):
-                        event_type, payload = event_queue.get()
-                        if event_type == "direction_result":
+                        if pending is not None:
+                            event_type, payload = pending
+                            pending = None
+                        else:
+                            event_type, payload = event_queue.get()
+                        if event_type == "status" and payload.get("entry"):
+                            # Directions report progress in bursts; send what arrives together as one frame.
+                            entries, pending = drain_status_batch(event_queue, payload["entry"])
+                            if len(entries) > 1:
+                                yield sse_message("status_batch", {"entries": entries})
+                            else:
+                                yield sse_message("status", payload)
+                        elif event_type == "direction_result":
                             idx = int(payload.get("index") or 0)
                             detail = payload.get("detail") or {}
                             if 0 <= idx < len(direction_details):
@@ -1315,7 +1343,7 @@ def create_app() -> Flask:
                         else:
                             yield sse_message(event_type, payload)
 
-                    combined_bibtex = "\n\n".join(part.strip() for part in combined_bibtex_parts if part.strip())
+                    combined_bibtex = "\n\n".join(combined_bibtex_parts)  # parts are stripped and non-empty on append
                     yield sse_message(
                         "workflow_done",
                         {
@@ -1335,8 +1363,7 @@ def create_app() -> Flask:
                 yield sse_message("error", {"message": str(exc)})
                 return
 
-        headers = {"Cache-Control": "no-cache", "Connection": "keep-alive"}
-        return Response(stream_with_context(event_stream()), mimetype="text/event-stream", headers=headers)
+        return Response(stream_with_context(event_stream()), mimetype="text/event-stream", headers=_SSE_HEADERS)
 
     @app.route("/api/search_stream", methods=["POST"])
     @admin_required
@@ -1350,12 +1377,11 @@ def create_app() -> Flask:
 
         def event_stream():
             for event in perform_search_stream(**resolved):
-                event_type = str(event.get("type") or "message")
-                payload = {k: v for k, v in event.items() if k != "type"}
-                yield sse_message(event_type, payload)
+                # Each event dict is freshly built by the producer, so strip "type" in place.
+                event_type = str(event.pop("type", None) or "message")
+                yield sse_message(event_type, event)
 
-        headers = {"Cache-Control": "no-cache", "Connection": "keep-alive"}
-        return Response(stream_with_context(event_stream()), mimetype="text/event-stream", headers=headers)
+        return Response(stream_with_context(event_stream()), mimetype="text/event-stream", headers=_SSE_HEADERS)
 
     return app
 
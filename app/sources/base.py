@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import List, Protocol
 
 
-@dataclass
+@dataclass(slots=True)
 class ArticleInfo:
     pmid: str = ""
     title: str = ""
@@ -25,6 +25,9 @@ class ArticleInfo:
     pmcid: str = ""
     annote: str = ""
     key: str = ""
+    # Parsed from annote when the AI summary is applied, so rendering needn't re-parse it.
+    summary_zh: str = ""
+    usage_zh: str = ""
 
 
 class PaperSource(Protocol):
@@ -32,6 +35,9 @@ class PaperSource(Protocol):
 
     name: str
     display_name: str
+    # Whether search() needs a contact email (NCBI E-utilities do); resolve_form only
+    # generates a placeholder address for sources that set this.
+    requires_email: bool
 
     def search(self, query: str, years: int, max_results: int, **kwargs) -> List[ArticleInfo]:
         ...
@@ -8,6 +8,7 @@ from typing import List, Optional
 
 import requests
 from requests import Response
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectionError as RequestsConnectionError
 from requests.exceptions import RequestException, Timeout
 
@@ -31,6 +32,12 @@ except (TypeError, ValueError):
     _PUBMED_BACKOFF_MAX = 10.0
 _PUBMED_RETRY_STATUS = {429, 500, 502, 503, 504}
 
+# One pooled session for all E-utilities calls, so directions and retries reuse
+# keep-alive TLS connections instead of handshaking per request. The pool is sized
+# above any per-workflow PubMed concurrency so connections aren't discarded.
+_PUBMED_SESSION = requests.Session()
+_PUBMED_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=32))
+
 
 def _safe_int(value: str) -> Optional[int]:
     try:
@@ -52,6 +59,7 @@ def _sleep_backoff(attempt: int, *, retry_after_seconds: Optional[int] = None) -
 class PubMedSource(PaperSource):
     name = "pubmed"
     display_name = "PubMed"
+    requires_email = True
 
     def _get_with_retry(
         self,
@@ -66,7 +74,7 @@ class PubMedSource(PaperSource):
         for attempt in range(_PUBMED_MAX_RETRIES + 1):
             try:
                 with semaphore:
-                    resp = requests.get(url, params=params, timeout=timeout)
+                    resp = _PUBMED_SESSION.get(url, params=params, timeout=timeout)
                 status_code = int(resp.status_code)
 
                 if status_code in _PUBMED_RETRY_STATUS:
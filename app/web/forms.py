@@ -1,58 +1,93 @@
 from __future__ import annotations
 
 import os
+import random
 import secrets
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Dict, Mapping, Optional, Tuple
 
-from app.sources.registry import list_sources
+from app.sources.registry import get_source, list_sources
 
 
-def get_default_years(source_name: str) -> int:
-    return 5
+# The generated address is only a courtesy identifier for NCBI, not a secret, so a
+# non-cryptographic RNG seeded once from secrets is enough; unlike a time-based counter,
+# workers started together don't hand out the same addresses.
+_email_rng = random.Random(secrets.token_bytes(32))
 
 
-def get_default_max_results(source_name: str) -> int:
-    return 5
+# Read on first use rather than at import: create_app loads .env after this module is imported.
+@lru_cache(maxsize=1)
+def _email_domain() -> str:
+    return os.environ.get("DEFAULT_EMAIL_DOMAIN") or "example.com"
 
 
 def generate_random_email() -> str:
-    local_part = f"user_{secrets.token_hex(4)}"
-    domain = os.environ.get("DEFAULT_EMAIL_DOMAIN") or "example.com"
-    return f"{local_part}@{domain}"
+    return f"user_{_email_rng.getrandbits(32):08x}@{_email_domain()}"
 
 
-def get_default_email(source_name: str) -> str:
-    return ""
+# Defaults don't vary by source, so one shared read-only mapping serves every name
+# (including unknown ones from requests) without keeping per-name copies around.
+_SOURCE_DEFAULTS: Mapping[str, str | int] = MappingProxyType(
+    {
+        "years": 5,
+        "max_results": 5,
+        "email": "",
+        "api_key": "",
+        "output": "pubmed_results.bib",
+    }
+)
 
 
-def get_default_api_key(source_name: str) -> str:
-    return ""
+def get_source_defaults(source_name: str) -> Mapping[str, str | int]:
+    return _SOURCE_DEFAULTS
 
 
-def get_source_defaults(source_name: str) -> Dict[str, str | int]:
-    return {
-        "years": get_default_years(source_name),
-        "max_results": get_default_max_results(source_name),
-        "email": get_default_email(source_name),
-        "api_key": get_default_api_key(source_name),
-        "output": "pubmed_results.bib",
-    }
+# The source registry is fixed at import time, so resolve the default once.
+_DEFAULT_SOURCE_NAME = next((source.name for source in list_sources()), "")
 
 
 def default_source_name() -> str:
-    sources = list_sources()
-    return sources[0].name if sources else ""
+    return _DEFAULT_SOURCE_NAME
 
 
 def default_ai_provider_name() -> str:
     return "openai"
 
 
-def default_query(source_name: str) -> str:
-    return '"artificial intelligence" AND ("dental implants" OR "implant dentistry" OR "oral implantology")'
+_DEFAULT_QUERY = '"artificial intelligence" AND ("dental implants" OR "implant dentistry" OR "oral implantology")'
 
 
+def default_query(source_name: str) -> str:
+    return _DEFAULT_QUERY
+
+
+_FORM_FIELDS = (
+    "source",
+    "ai_provider",
+    "query",
+    "years",
+    "max_results",
+    "email",
+    "api_key",
+    "output",
+    "gemini_api_key",
+    "gemini_model",
+    "gemini_temperature",
+    "openai_api_key",
+    "openai_base_url",
+    "openai_model",
+    "openai_temperature",
+)
+
+
+# JSON bodies already carry numbers and blank form fields are common; both are answered
+# without raising. Floats in parse_int still go through int() so nan/inf behave as before.
 def parse_int(value: str, default_value: int) -> int:
+    if isinstance(value, int):
+        return int(value)
+    if value is None or value == "":
+        return default_value
     try:
         return int(value)
     except (TypeError, ValueError):
@@ -60,12 +95,26 @@ def parse_int(value: str, default_value: int) -> int:
 
 
 def parse_float(value: str, default_value: float) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if value is None or value == "":
+        return default_value
     try:
         return float(value)
     except (TypeError, ValueError):
         return default_value
 
 
+def default_form(*, preset_ai_config: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """GET 页面用的空表单：等同 resolve_form({}) 的表单部分，但不解析检索参数（也不生成随机邮箱）。"""
+
+    source = default_source_name()
+    ai_provider = str((preset_ai_config or {}).get("ai_provider") or "") or default_ai_provider_name()
+    form = dict.fromkeys(_FORM_FIELDS, "")
+    form.update(source=source, ai_provider=ai_provider, query=default_query(source))
+    return form
+
+
 def resolve_form(
     form_data: Mapping[str, str],
     *,
@@ -82,68 +131,48 @@ def resolve_form(
             return base or str(preset_ai_config.get(key) or "")
         return str(preset_ai_config.get(key) or "")
 
+    def _field(key: str) -> str:
+        value = form_data.get(key)
+        return value.strip() if value else ""
+
     source = (form_data.get("source") or default_source_name()).strip()
     defaults = get_source_defaults(source)
 
     ai_provider = _effective(form_data.get("ai_provider") or "", "ai_provider") or default_ai_provider_name()
     query = (form_data.get("query") or default_query(source)).strip()
-    years_raw = (form_data.get("years") or "").strip()
-    max_results_raw = (form_data.get("max_results") or "").strip()
-    email_raw = (form_data.get("email") or "").strip()
-    api_key_raw = (form_data.get("api_key") or "").strip()
-    output_raw = (form_data.get("output") or "").strip()
-    gemini_api_key_raw = (form_data.get("gemini_api_key") or "").strip()
-    gemini_model_raw = (form_data.get("gemini_model") or "").strip()
-    gemini_temperature_raw = (form_data.get("gemini_temperature") or "").strip()
-    openai_api_key_raw = (form_data.get("openai_api_key") or "").strip()
-    openai_base_url_raw = (form_data.get("openai_base_url") or "").strip()
-    openai_model_raw = (form_data.get("openai_model") or "").strip()
-    openai_temperature_raw = (form_data.get("openai_temperature") or "").strip()
-
-    if email_raw:
-        resolved_email = email_raw
+
+    # Every field echoes its stripped raw value, except the three resolved above.
+    form = {key: _field(key) for key in _FORM_FIELDS}
+    form.update(source=source, ai_provider=ai_provider, query=query)
+
+    if form["email"]:
+        resolved_email = form["email"]
     elif defaults["email"]:
         resolved_email = str(defaults["email"])
-    else:
+    elif getattr(get_source(source), "requires_email", False):
         resolved_email = generate_random_email()
+    else:
+        resolved_email = ""
 
-    resolved_output = output_raw or str(defaults["output"])
-    resolved_gemini_temperature = parse_float(gemini_temperature_raw, 0.0)
+    resolved_output = form["output"] or str(defaults["output"])
+    resolved_gemini_temperature = parse_float(form["gemini_temperature"], 0.0)
 
     resolved = {
         "source": source,
         "ai_provider": ai_provider,
         "query": query,
-        "years": parse_int(years_raw, int(defaults["years"])),
-        "max_results": parse_int(max_results_raw, int(defaults["max_results"])),
+        "years": parse_int(form["years"], int(defaults["years"])),
+        "max_results": parse_int(form["max_results"], int(defaults["max_results"])),
         "email": resolved_email,
-        "api_key": api_key_raw or str(defaults["api_key"]),
+        "api_key": form["api_key"] or str(defaults["api_key"]),
         "output": resolved_output,
-        "gemini_api_key": _effective(gemini_api_key_raw, "gemini_api_key"),
-        "gemini_model": _effective(gemini_model_raw, "gemini_model"),
-        "gemini_temperature": parse_float(_effective(gemini_temperature_raw, "gemini_temperature"), resolved_gemini_temperature),
-        "openai_api_key": _effective(openai_api_key_raw, "openai_api_key"),
-        "openai_base_url": _effective(openai_base_url_raw, "openai_base_url"),
-        "openai_model": _effective(openai_model_raw, "openai_model"),
-        "openai_temperature": parse_float(_effective(openai_temperature_raw, "openai_temperature"), 0.0),
-    }
-
-    form = {
-        "source": source,
-        "ai_provider": ai_provider,
-        "query": query,
-        "years": years_raw,
-        "max_results": max_results_raw,
-        "email": email_raw,
-        "api_key": api_key_raw,
-        "output": output_raw,
-        "gemini_api_key": gemini_api_key_raw,
-        "gemini_model": gemini_model_raw,
-        "gemini_temperature": gemini_temperature_raw,
-        "openai_api_key": openai_api_key_raw,
-        "openai_base_url": openai_base_url_raw,
-        "openai_model": openai_model_raw,
-        "openai_temperature": openai_temperature_raw,
+        "gemini_api_key": _effective(form["gemini_api_key"], "gemini_api_key"),
+        "gemini_model": _effective(form["gemini_model"], "gemini_model"),
+        "gemini_temperature": parse_float(_effective(form["gemini_temperature"], "gemini_temperature"), resolved_gemini_temperature),
+        "openai_api_key": _effective(form["openai_api_key"], "openai_api_key"),
+        "openai_base_url": _effective(form["openai_base_url"], "openai_base_url"),
+        "openai_model": _effective(form["openai_model"], "openai_model"),
+        "openai_temperature": parse_float(_effective(form["openai_temperature"], "openai_temperature"), 0.0),
     }
 
     return form, resolved
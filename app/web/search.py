@@ -1,14 +1,16 @@
 from __future__ import annotations
 
-import json
+import queue
 import threading
-from typing import Dict, Generator, List, Tuple
+import time
+from typing import Dict, Generator, List, Optional, Tuple
 
 from app.sources import ArticleInfo
 from app.sources.registry import get_source
 
-from app.core.ai_summary import apply_ai_summary, normalize_annote
+from app.core.ai_summary import apply_ai_summary
 from app.core.bibtex import build_bibtex_entries
+from app.core.fast_json import dumps as json_dumps
 
 
 def status_log_entry(step: str, status: str, detail: str) -> Dict[str, str]:
@@ -16,13 +18,38 @@ def status_log_entry(step: str, status: str, detail: str) -> Dict[str, str]:
 
 
 def sse_message(event: str, data: Dict[str, object]) -> str:
-    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
-
-
-def build_view_article(info: ArticleInfo) -> Dict[str, str]:
-    annote, summary_zh, usage_zh = normalize_annote(info.annote)
-    info.annote = annote
-
+    return f"event: {event}\ndata: {json_dumps(data)}\n\n"
+
+
+# Status entries queued within this window of each other go out as one status_batch frame.
+STATUS_BATCH_WINDOW = 0.05
+STATUS_BATCH_MAX = 50
+
+
+def drain_status_batch(
+    event_queue: "queue.Queue[Tuple[str, Dict[str, object]]]",
+    first_entry: Dict[str, str],
+) -> Tuple[List[Dict[str, str]], Optional[Tuple[str, Dict[str, object]]]]:
+    """收集紧随其后的 status 事件；遇到其他事件立即停止，并把它返回给调用方先处理。"""
+
+    entries = [first_entry]
+    deadline = time.monotonic() + STATUS_BATCH_WINDOW
+    while len(entries) < STATUS_BATCH_MAX:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            event_type, payload = event_queue.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if event_type != "status" or not payload.get("entry"):
+            return entries, (event_type, payload)
+        entries.append(payload["entry"])
+    return entries, None
+
+
+def view_article(info: ArticleInfo) -> Dict[str, str]:
+    # Sources never set annote; apply_ai_summary fills summary_zh/usage_zh alongside it.
     return {
         "title": info.title or "(无标题)",
         "authors": info.authors,
@@ -31,8 +58,8 @@ def build_view_article(info: ArticleInfo) -> Dict[str, str]:
         "abstract": info.abstract,
         "url": info.url,
         "pmid": info.pmid,
-        "summary_zh": summary_zh,
-        "usage_zh": usage_zh,
+        "summary_zh": info.summary_zh,
+        "usage_zh": info.usage_zh,
     }
 
 
@@ -116,8 +143,10 @@ def perform_search_stream(
             yield {"type": "status", "entry": _emit("AI 摘要", ai_entry_status, ai_status)}
             ai_failed = ai_entry_status == "error"
 
+        # Cards go out as soon as the summaries are in, ahead of BibTeX generation; the
+        # (larger) BibTeX text follows in result_end.
         for info in articles:
-            info.annote, _, _ = normalize_annote(info.annote)
+            yield {"type": "article", "article": view_article(info)}
 
         yield {"type": "status", "entry": _emit("BibTeX 生成", "running", "正在整理文献并生成 BibTeX...")}
         bibtex_text, count = build_bibtex_entries(articles)
@@ -126,14 +155,7 @@ def perform_search_stream(
         if ai_failed:
             status_log.append(status_log_entry("AI 摘要", "error", "AI 摘要失败，已返回未总结的结果"))
 
-        view_articles = [build_view_article(info) for info in articles]
-        yield {
-            "type": "result",
-            "bibtex_text": bibtex_text,
-            "count": count,
-            "articles": view_articles,
-            "status_log": status_log,
-        }
+        yield {"type": "result_end", "bibtex_text": bibtex_text, "count": count, "status_log": status_log}
     except Exception as exc:  # pylint: disable=broad-except
         yield {
             "type": "status",
@@ -150,22 +172,27 @@ def consume_search_stream(resolved: Dict[str, object]) -> Tuple[str, str, int, L
     articles: List[Dict[str, str]] = []
     status_log: List[Dict[str, str]] = []
 
+    # perform_search_stream above is the only producer, so the event schema is known.
     for event in perform_search_stream(**resolved):
-        if event.get("type") == "status" and event.get("entry"):
+        event_type = event["type"]
+        if event_type == "status":
             status_log.append(event["entry"])
-        if event.get("type") == "result":
-            bibtex_text = str(event.get("bibtex_text") or "")
-            count = int(event.get("count") or 0)
-            articles = event.get("articles") or []
-        if event.get("type") == "error" and event.get("message"):
-            error = str(event.get("message"))
+        elif event_type == "article":
+            articles.append(event["article"])
+        elif event_type == "result_end":
+            bibtex_text = event["bibtex_text"]
+            count = event["count"]
+        elif event_type == "error":
+            error = event["message"]
+            articles = []
     return error, bibtex_text, count, articles, status_log
 
 
 def prefix_status(direction: str, entries: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    prefix = f"[{direction}] "
     return [
         {
-            "step": f"[{direction}] {entry.get('step', '')}",
+            "step": prefix + entry.get("step", ""),
             "status": entry.get("status", ""),
             "detail": entry.get("detail", ""),
         }
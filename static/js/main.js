@@ -585,6 +585,16 @@ function renderArticles(articles) {
   container.innerHTML = fragments.join('');
 }
 
+function clearArticles() {
+  const container = $('#article-container');
+  if (container) container.innerHTML = '';
+}
+
+function appendArticle(article) {
+  const container = $('#article-container');
+  if (container) container.insertAdjacentHTML('beforeend', buildArticleMarkup(article));
+}
+
 function renderDirectionGroups(directionDetails) {
   const container = $('#direction-results');
   if (!container) return;
@@ -700,6 +710,26 @@ async function streamSearch(event) {
     submit.textContent = '运行中...';
   }
   const formData = new FormData(form);
+  // Results arrive as one article event per paper, then result_end with the BibTeX text.
+  const articles = [];
+  const handleEvent = (eventType, payload) => {
+    if (eventType === 'status' && payload.entry) appendStatus(payload.entry);
+    if (eventType === 'error' && payload.message) {
+      showError(payload.message);
+      stopTimer(false, payload.message);
+    }
+    if (eventType === 'article' && payload.article) {
+      if (!articles.length) clearArticles();
+      articles.push(payload.article);
+      appendArticle(payload.article);
+    }
+    if (eventType === 'result_end') {
+      updateBibtex(payload.bibtex_text, payload.count);
+      ensureAiStatusFinal({ articles });
+      if (!articles.length) renderArticles([]);
+      stopTimer(true);
+    }
+  };
   try {
     const resp = await fetch('/api/search_stream', { method: 'POST', body: formData });
     if (!resp.ok || !resp.body) throw new Error('接口返回异常');
@@ -714,32 +744,12 @@ async function streamSearch(event) {
       buffer = parts.pop() || '';
       parts.filter(Boolean).forEach((part) => {
         const { eventType, payload } = parseSse(part);
-        if (eventType === 'status' && payload.entry) appendStatus(payload.entry);
-        if (eventType === 'error' && payload.message) {
-          showError(payload.message);
-          stopTimer(false, payload.message);
-        }
-        if (eventType === 'result') {
-          ensureAiStatusFinal(payload);
-          updateBibtex(payload.bibtex_text, payload.count);
-          renderArticles(payload.articles || []);
-          stopTimer(true);
-        }
+        handleEvent(eventType, payload);
       });
     }
     if (buffer.trim()) {
       const { eventType, payload } = parseSse(buffer.trim());
-      if (eventType === 'status' && payload.entry) appendStatus(payload.entry);
-      if (eventType === 'error' && payload.message) {
-        showError(payload.message);
-        stopTimer(false, payload.message);
-      }
-      if (eventType === 'result') {
-        ensureAiStatusFinal(payload);
-        updateBibtex(payload.bibtex_text, payload.count);
-        renderArticles(payload.articles || []);
-        stopTimer(true);
-      }
+      handleEvent(eventType, payload);
     }
   } catch (err) {
     console.error(err);
@@ -885,6 +895,12 @@ async function runAutoWorkflow(event) {
     let workflowAnyError = false;
     let milestonesEmitted = false;
 
+    // Per-direction entries ("[方向] ...") are shown in the direction cards, not the main list.
+    const appendWorkflowStatus = (entry) => {
+      if (!entry || String(entry.step || '').startsWith('[')) return;
+      appendStatus(entry);
+    };
+
     const scheduleRenderDirections = () => {
       if (scheduledDirectionRender) return;
       scheduledDirectionRender = true;
@@ -917,9 +933,9 @@ async function runAutoWorkflow(event) {
       buffer = parts.pop() || '';
       parts.filter(Boolean).forEach((part) => {
         const { eventType, payload } = parseSse(part);
-        if (eventType === 'status' && payload.entry) {
-          const step = String(payload.entry.step || '');
-          if (!step.startsWith('[')) appendStatus(payload.entry);
+        if (eventType === 'status' && payload.entry) appendWorkflowStatus(payload.entry);
+        if (eventType === 'status_batch' && Array.isArray(payload.entries)) {
+          payload.entries.forEach(appendWorkflowStatus);
         }
         if (eventType === 'error' && payload.message) {
           showError(payload.message);
@@ -967,9 +983,9 @@ async function runAutoWorkflow(event) {
 
     if (buffer.trim()) {
       const { eventType, payload } = parseSse(buffer.trim());
-      if (eventType === 'status' && payload.entry) {
-        const step = String(payload.entry.step || '');
-        if (!step.startsWith('[')) appendStatus(payload.entry);
+      if (eventType === 'status' && payload.entry) appendWorkflowStatus(payload.entry);
+      if (eventType === 'status_batch' && Array.isArray(payload.entries)) {
+        payload.entries.forEach(appendWorkflowStatus);
       }
       if (eventType === 'error' && payload.message) {
         showError(payload.message);